@@ -32,7 +32,7 @@ REQUIRED = [
 ]
 
 EXTRAS = {
-    'COMPLETE': ['matplotlib', 'plotly', 'unitpy', 'tkinterdnd2', 'urllib', 'json_equationer'] #This is a list.
+    'COMPLETE': ['matplotlib', 'plotly', 'unitpy', 'tkinterdnd2', 'urllib', 'json_equationer', 'orjson', "zstandard; python_version < '3.14'"] #This is a list. orjson is used by the compact json writer when it is available, and zstandard for .zst records before python 3.14.
 }
 
 #To make sure the license etc. is included, I added the DATA_FILES object based on https://stackoverflow.com/questions/9977889/how-to-include-license-file-in-setup-py-script
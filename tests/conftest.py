@@ -0,0 +1,44 @@
+import glob
+import json
+import os
+import sys
+
+#The tests use the JSONGrapher package of this repository rather than an installed copy.
+repository_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_directory)
+
+import pytest
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+
+examples_directory = os.path.join(repository_directory, "examples")
+drag_and_drop_examples_directory = os.path.join(examples_directory, "example_1_drag_and_drop")
+
+#Makes a small record with one data series and axis labels with units.
+def make_simple_record(x_values=(1, 2, 3), y_values=(4, 5, 6), series_name="series_1"):
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.set_comments("A record made for the tests.")
+    record.set_datatype("Test_Data")
+    record.set_x_axis_label_including_units("Temperature (K)")
+    record.set_y_axis_label_including_units("Pressure (Pa)")
+    record.add_data_series(series_name, list(x_values), list(y_values))
+    return record
+
+@pytest.fixture
+def simple_record():
+    return make_simple_record()
+
+@pytest.fixture
+def example_record_filename():
+    return os.path.join(drag_and_drop_examples_directory, "LaFeO3.json")
+
+#Returns the json files of the examples that are valid json. Some of the example files are not, on purpose.
+def get_example_json_filenames():
+    json_filenames = []
+    for json_filename in sorted(glob.glob(os.path.join(examples_directory, "**", "*.json"), recursive=True)):
+        try:
+            with open(json_filename, "r", encoding="utf-8") as json_file:
+                json.loads(json_file.read())
+        except ValueError:
+            continue
+        json_filenames.append(json_filename)
+    return json_filenames
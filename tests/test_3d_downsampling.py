@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+
+
+def make_grid_data_series(data_series_type, number_of_grid_lines=30):
+    x_grid, y_grid = np.meshgrid(np.linspace(0, 1, number_of_grid_lines), np.linspace(10, 20, number_of_grid_lines))
+    z_values = np.sin(x_grid * 5) * y_grid
+    return {"type": data_series_type, "name": "grid", "x": x_grid.ravel().tolist(), "y": y_grid.ravel().tolist(), "z": z_values.ravel().tolist()}
+
+
+def make_random_data_series(data_series_type, number_of_points=2000):
+    random_generator = np.random.default_rng(0)
+    return {"type": data_series_type, "name": "random", "x": random_generator.random(number_of_points).tolist(), "y": random_generator.random(number_of_points).tolist(),
+            "z": random_generator.normal(size=number_of_points).tolist(), "marker": {"color": random_generator.normal(size=number_of_points).tolist()},
+            "text": [str(index) for index in range(number_of_points)]}
+
+
+@pytest.mark.parametrize("make_data_series", [make_grid_data_series, make_random_data_series])
+@pytest.mark.parametrize("data_series_type", ["scatter3d", "mesh3d"])
+def test_budget_and_value_ranges_are_kept(make_data_series, data_series_type):
+    data_series = make_data_series(data_series_type)
+    for max_points_per_series in [0, 1, 3, 5, 10, 100, 500]:
+        downsampled_data_series = JSONRecordCreator.downsample_3d_data_series(data_series, max_points_per_series)
+        assert len(downsampled_data_series["x"]) <= max_points_per_series
+        assert len(downsampled_data_series["y"]) == len(downsampled_data_series["z"]) == len(downsampled_data_series["x"])
+        if max_points_per_series >= 10:
+            assert (min(downsampled_data_series["z"]), max(downsampled_data_series["z"])) == (min(data_series["z"]), max(data_series["z"]))
+    if "marker" in data_series:
+        downsampled_data_series = JSONRecordCreator.downsample_3d_data_series(data_series, 100)
+        assert max(downsampled_data_series["marker"]["color"]) == max(data_series["marker"]["color"])
+        point_indices = [int(text) for text in downsampled_data_series["text"]]
+        assert downsampled_data_series["x"] == [data_series["x"][index] for index in point_indices]
+    assert JSONRecordCreator.downsample_3d_data_series(data_series, len(data_series["x"])) is data_series
+
+
+def test_grids_stay_regular_grids():
+    downsampled_data_series = JSONRecordCreator.downsample_3d_data_series(make_grid_data_series("mesh3d"), 200)
+    grid_points = set(zip(downsampled_data_series["x"], downsampled_data_series["y"]))
+    x_values, y_values = sorted(set(downsampled_data_series["x"])), sorted(set(downsampled_data_series["y"]))
+    assert (x_values[0], x_values[-1], y_values[0], y_values[-1]) == (0, 1, 10, 20) #the ranges of x and y are kept.
+    #apart from the extreme value points, every kept x value is kept with every kept y value.
+    number_of_grid_points = sum((x_value, y_value) in grid_points for x_value in x_values for y_value in y_values)
+    assert number_of_grid_points >= len(grid_points) - 4
+
+
+def test_mesh_triangles_are_remapped_to_the_kept_vertices():
+    number_of_grid_lines = 40
+    data_series = make_grid_data_series("mesh3d", number_of_grid_lines)
+    data_series["x"] = (np.array(data_series["x"]) + np.random.default_rng(0).normal(0, 1e-3, len(data_series["x"]))).tolist() #not a regular grid.
+    triangles = []
+    for row_index in range(number_of_grid_lines - 1):
+        for column_index in range(number_of_grid_lines - 1):
+            corner_index = row_index * number_of_grid_lines + column_index
+            triangles.append([corner_index, corner_index + 1, corner_index + number_of_grid_lines])
+            triangles.append([corner_index + 1, corner_index + number_of_grid_lines + 1, corner_index + number_of_grid_lines])
+    data_series["i"], data_series["j"], data_series["k"] = [list(corners) for corners in zip(*triangles)]
+    downsampled_data_series = JSONRecordCreator.downsample_3d_data_series(data_series, 300)
+    number_of_kept_points = len(downsampled_data_series["x"])
+    assert number_of_kept_points <= 300
+    new_triangles = np.column_stack([downsampled_data_series[index_field] for index_field in ["i", "j", "k"]])
+    assert len(new_triangles) > 0
+    assert new_triangles.min() >= 0 and new_triangles.max() < number_of_kept_points
+    assert np.all((new_triangles[:, 0] != new_triangles[:, 1]) & (new_triangles[:, 1] != new_triangles[:, 2]) & (new_triangles[:, 0] != new_triangles[:, 2]))
+    assert len(np.unique(np.sort(new_triangles, axis=1), axis=0)) == len(new_triangles)
+
+
+def test_plotting_downsamples_3d_series():
+    fig_dict = {"layout": {}, "data": [make_random_data_series("scatter3d")]}
+    downsampled_fig_dict = JSONRecordCreator.downsample_fig_dict(fig_dict, 100)
+    assert len(downsampled_fig_dict["data"][0]["x"]) <= 100
+    assert len(fig_dict["data"][0]["x"]) == 2000
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record, get_example_json_filenames
+
+mixed_fig_dict = {"comments": "c",
+                  "data": [{"name": "a", "x": [1, 2, None, 4], "y": [1.5, None, 3.0, 4.25], "z": [1, 2.5], "text": ["a"]},
+                           {"name": "b", "x": ["a", "b"], "y": []},
+                           {"name": "c", "x": [True, False], "y": [2**60, 1]}],
+                  "layout": {"title": {"text": "t"}}}
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_binary_round_trip_of_the_examples(tmp_path, memory_map):
+    binary_filename = str(tmp_path / "record.jgb")
+    for json_filename in get_example_json_filenames():
+        with open(json_filename, "r", encoding="utf-8") as json_file:
+            fig_dict = json.loads(json_file.read())
+        JSONRecordCreator.write_JSONGrapher_binary_file(fig_dict, binary_filename)
+        read_fig_dict = JSONRecordCreator.read_JSONGrapher_binary_file(binary_filename, memory_map=memory_map)
+        assert json.dumps(read_fig_dict) == json.dumps(fig_dict), json_filename #the value types (int or float) are also kept.
+
+
+def test_binary_round_trip_keeps_values_that_are_not_columns(tmp_path):
+    binary_filename = str(tmp_path / "record.jgb")
+    JSONRecordCreator.write_JSONGrapher_binary_file(mixed_fig_dict, binary_filename)
+    assert json.dumps(JSONRecordCreator.read_JSONGrapher_binary_file(binary_filename)) == json.dumps(mixed_fig_dict)
+
+
+def test_data_as_arrays_gives_float_arrays_with_nan_for_null(tmp_path):
+    binary_filename = str(tmp_path / "record.jgb")
+    JSONRecordCreator.write_JSONGrapher_binary_file(mixed_fig_dict, binary_filename)
+    fig_dict = JSONRecordCreator.read_JSONGrapher_binary_file(binary_filename, data_as_arrays=True)
+    assert isinstance(fig_dict["data"][0]["x"], np.ndarray)
+    np.testing.assert_array_equal(fig_dict["data"][0]["y"], [1.5, np.nan, 3.0, 4.25])
+
+
+def test_record_export_and_import_of_binary_files(tmp_path):
+    record = make_simple_record(x_values=range(5), y_values=[0.1*index for index in range(5)])
+    record.export_to_binary(str(tmp_path / "record"))
+    imported_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    imported_record.import_from_file(str(tmp_path / "record.jgb"))
+    assert imported_record.fig_dict == record.fig_dict
+
+
+def test_records_read_as_arrays_can_be_exported_and_plotted(tmp_path):
+    record = make_simple_record(x_values=[1, 2, 3], y_values=[4, None, 6])
+    record.export_to_binary(str(tmp_path / "record.jgb"))
+    arrays_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    arrays_record.import_from_binary(str(tmp_path / "record.jgb"), data_as_arrays=True)
+    arrays_record.export_to_json_file(str(tmp_path / "record.json"))
+    with open(str(tmp_path / "record.json"), "r", encoding="utf-8") as json_file:
+        assert json.loads(json_file.read())["data"][0]["y"] == [4, None, 6]
+    assert isinstance(arrays_record.fig_dict["data"][0]["y"], np.ndarray) #the record keeps its arrays.
+    pytest.importorskip("plotly")
+    for use_cache in [False, True]:
+        fig = arrays_record.get_plotly_fig(use_cache=use_cache)
+        assert list(fig.data[0].x) == [1, 2, 3]
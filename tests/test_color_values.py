@@ -0,0 +1,33 @@
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+def make_rainbow_data_series():
+    return {"name": "a", "x": [1, 2, 3], "y": [4, None, 6], "trace_style": "scatter__rainbow"}
+
+
+def test_color_values_are_copies_by_default():
+    data_series = JSONRecordCreator.apply_trace_style_to_single_data_series(make_rainbow_data_series(), trace_styles_collection="default")
+    assert data_series["marker"]["color"] == [4, 0, 6]
+    data_series["y"][0] = 100
+    assert data_series["marker"]["color"][0] == 4
+
+
+def test_aliased_color_values_are_cleaned_for_plotting():
+    data_series = JSONRecordCreator.apply_trace_style_to_single_data_series(make_rainbow_data_series(), trace_styles_collection="default", alias_color_values=True)
+    assert data_series["marker"]["color"] is data_series["y"]
+    fig_dict = JSONRecordCreator.update_color_values({"data": [data_series]})
+    assert fig_dict["data"][0]["marker"]["color"] == [4, 0, 6]
+    assert data_series["y"] == [4, None, 6] #the data list itself is not changed.
+
+
+def test_plotting_does_not_alias_the_stored_record():
+    record = make_simple_record(y_values=[4, None, 6])
+    record.fig_dict["data"][0]["trace_style"] = "scatter__rainbow"
+    for use_cache in [False, True]:
+        fig = record.get_plotly_fig(use_cache=use_cache)
+        assert list(fig.data[0].marker.color) == [4, 0, 6]
+        stored_data_series = record.fig_dict["data"][0]
+        assert stored_data_series["y"] == [4, None, 6]
+        if "marker" in stored_data_series:
+            assert stored_data_series["marker"].get("color") is not stored_data_series["y"]
@@ -0,0 +1,59 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record, get_example_json_filenames
+
+values_fig_dict = {"comments": "Unicode °C and \"quotes\"",
+                   "data": [{"name": "a", "x": [0.1, 1e-300, 1.7976931348623157e308, -0.0, 3, None, True],
+                             "y": [1/3, 2/3, float("nan"), float("inf")], "marker": {"color": ["red", "blue"]}, "z": [[1, 2], [3, 4]]}],
+                   "layout": {"title": {"text": "t"}, "xaxis": {}}}
+
+
+def get_compact_json_text(object_to_write, **keyword_arguments):
+    text_stream = io.StringIO()
+    JSONRecordCreator.write_compact_json(object_to_write, text_stream, **keyword_arguments)
+    return text_stream.getvalue()
+
+
+@pytest.mark.parametrize("pretty_metadata", [True, False])
+@pytest.mark.parametrize("use_fast_backend", [True, False])
+def test_compact_json_reads_back_the_same(pretty_metadata, use_fast_backend):
+    compact_text = get_compact_json_text(values_fig_dict, pretty_metadata=pretty_metadata, use_fast_backend=use_fast_backend)
+    assert json.dumps(json.loads(compact_text)) == json.dumps(values_fig_dict)
+
+
+def test_fast_backend_writes_the_same_text_as_the_json_module():
+    pytest.importorskip("orjson")
+    for json_filename in get_example_json_filenames():
+        with open(json_filename, "r", encoding="utf-8") as json_file:
+            fig_dict = json.loads(json_file.read())
+        assert get_compact_json_text(fig_dict, use_fast_backend=True) == get_compact_json_text(fig_dict, use_fast_backend=False), json_filename
+
+
+def test_arrays_of_numbers_are_written_on_one_line():
+    compact_text = get_compact_json_text({"data": [{"x": list(range(100)), "y": [0.5]*100}]})
+    assert len(compact_text.splitlines()) < 20
+
+
+def test_float_precision_and_numpy_arrays():
+    compact_text = get_compact_json_text({"x": np.array([1/3, 2/3]), "y": [1/3, float("nan")]}, float_precision=3)
+    assert json.loads(compact_text)["x"] == [0.333, 0.667]
+    assert json.loads(compact_text)["y"][0] == 0.333
+
+
+def test_default_export_is_the_same_as_json_dump(tmp_path, simple_record):
+    simple_record.export_to_json_file(str(tmp_path / "record.json"))
+    assert (tmp_path / "record.json").read_text(encoding="utf-8") == json.dumps(simple_record.fig_dict, indent=4)
+
+
+def test_compact_export_reads_back_the_same_record(tmp_path):
+    record = make_simple_record(x_values=range(1000), y_values=[index**0.5 for index in range(1000)])
+    record.export_to_json_file(str(tmp_path / "record.json"), compact=True)
+    imported_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    imported_record.import_from_file(str(tmp_path / "record.json"))
+    assert imported_record.fig_dict == record.fig_dict
+    assert (tmp_path / "record.json").stat().st_size < len(json.dumps(record.fig_dict, indent=4))
@@ -0,0 +1,63 @@
+import gzip
+import json
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+from test_csv_reader import csv_header
+
+
+def is_zstd_available():
+    try:
+        from compression import zstd # pylint: disable=unused-import
+        return True
+    except ImportError:
+        pass
+    try:
+        import zstandard # pylint: disable=unused-import
+        return True
+    except ImportError:
+        return False
+
+
+def test_record_file_extensions():
+    assert JSONRecordCreator.get_record_file_extension("a/record.json.gz") == (".json", "gzip")
+    assert JSONRecordCreator.get_record_file_extension("record.CSV.zst") == (".csv", "zstd")
+    assert JSONRecordCreator.get_record_file_extension("record.jgb") == (".jgb", None)
+
+
+@pytest.mark.parametrize("filename, expected_filename", [("x", "x.json"), ("x.zst", "x.json.zst"), ("x.gz", "x.json.gz"),
+                                                          ("x.json", "x.json"), ("x.json.zstd", "x.json.zstd"), ("d.v1/x.gz", "d.v1/x.json.gz")])
+def test_json_extension_is_added_before_the_compression_extension(filename, expected_filename):
+    assert JSONRecordCreator.get_json_filename_with_extension(filename) == expected_filename
+
+
+@pytest.mark.parametrize("compressed_extension", [".gz", ".zst"])
+def test_compressed_json_round_trip(tmp_path, compressed_extension):
+    if (compressed_extension == ".zst") and not is_zstd_available():
+        pytest.skip("zstd needs python 3.14 or the zstandard package.")
+    record = make_simple_record(x_values=range(100), y_values=range(100))
+    record.export_to_json_file(str(tmp_path / ("record" + compressed_extension)))
+    written_filename = tmp_path / ("record.json" + compressed_extension)
+    assert written_filename.exists()
+    imported_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    imported_record.import_from_file(str(written_filename))
+    assert imported_record.fig_dict == record.fig_dict
+    lazy_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    lazy_record.import_from_file(str(written_filename), lazy=True)
+    assert list(lazy_record.fig_dict["data"][0]["y"]) == list(range(100))
+
+
+def test_gzip_output_adds_the_gz_extension(tmp_path, simple_record):
+    simple_record.export_to_json_file(str(tmp_path / "record.json"), gzip_output=True)
+    with gzip.open(str(tmp_path / "record.json.gz"), "rt", encoding="utf-8") as gzip_file:
+        assert json.loads(gzip_file.read()) == simple_record.fig_dict
+
+
+def test_compressed_csv_import(tmp_path):
+    with gzip.open(str(tmp_path / "record.csv.gz"), "wt", encoding="utf-8") as gzip_file:
+        gzip_file.write(csv_header + "1,2,3\n2,4,6\n")
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.import_from_file(str(tmp_path / "record.csv.gz"))
+    assert record.fig_dict["data"][1]["y"] == [3.0, 6.0]
@@ -0,0 +1,77 @@
+import copy
+import threading
+import time
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+#Simulation functions that record how many simulations run at the same time. Each returns a data series with y values from its "factor".
+class SimulationCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.number_running = 0
+        self.peak_number_running = 0
+        self.threads = set()
+
+    def simulate(self, data_series_dict):
+        with self.lock:
+            self.number_running += 1
+            self.peak_number_running = max(self.peak_number_running, self.number_running)
+            self.threads.add(threading.get_ident())
+        time.sleep(0.05 * (3 - data_series_dict["simulate"]["factor"] % 3)) #so the simulations finish out of order.
+        with self.lock:
+            self.number_running -= 1
+        factor = data_series_dict["simulate"]["factor"]
+        return {"data": dict(data_series_dict, x=[1, 2, 3], y=[factor, 2 * factor, 3 * factor])}
+
+
+@pytest.fixture
+def simulation_counter(monkeypatch):
+    counter = SimulationCounter()
+    monkeypatch.setitem(JSONRecordCreator.local_python_functions_dictionary, "counted_simulation", counter.simulate)
+    #the javascript simulations are replaced with the same function, so that no network or Node.js is needed.
+    monkeypatch.setattr(JSONRecordCreator, "run_js_simulation", lambda javascript_simulator_url, data_series_dict, verbose=False: counter.simulate(data_series_dict))
+    return counter
+
+
+def make_fig_dict_to_simulate(models):
+    fig_dict = make_simple_record().fig_dict
+    fig_dict["data"] = [{"name": "series_" + str(factor), "simulate": {"model": model, "simulation_function_label": "counted_simulation", "factor": factor}}
+                        for factor, model in enumerate(models)]
+    return fig_dict
+
+
+def test_simulations_run_concurrently_by_default(simulation_counter):
+    fig_dict = JSONRecordCreator.simulate_as_needed_in_fig_dict(make_fig_dict_to_simulate(["local_python"] * 6))
+    assert simulation_counter.peak_number_running > 1
+    assert [data_series["name"] for data_series in fig_dict["data"]] == ["series_" + str(factor) for factor in range(6)] #merged in the order of the data series.
+    assert [data_series["y"][0] for data_series in fig_dict["data"]] == list(range(6))
+
+
+def test_results_are_the_same_as_one_at_a_time(simulation_counter):
+    fig_dict_to_simulate = make_fig_dict_to_simulate(["local_python", "https://example.com/simulator.js"] * 3)
+    concurrent_fig_dict = JSONRecordCreator.simulate_as_needed_in_fig_dict(copy.deepcopy(fig_dict_to_simulate))
+    serial_fig_dict = JSONRecordCreator.simulate_as_needed_in_fig_dict(copy.deepcopy(fig_dict_to_simulate), concurrency_limit=1)
+    assert concurrent_fig_dict == serial_fig_dict
+
+
+@pytest.mark.parametrize("concurrency_limit, expected_peak_number_running", [(1, 1), (2, 2)])
+def test_concurrency_limit(simulation_counter, monkeypatch, concurrency_limit, expected_peak_number_running):
+    monkeypatch.setattr(JSONRecordCreator, "simulation_concurrency_limit", concurrency_limit)
+    JSONRecordCreator.simulate_as_needed_in_fig_dict(make_fig_dict_to_simulate(["local_python"] * 6))
+    assert simulation_counter.peak_number_running == expected_peak_number_running
+
+
+def test_local_python_simulations_can_be_run_one_at_a_time(simulation_counter, monkeypatch):
+    monkeypatch.setattr(JSONRecordCreator, "simulate_local_python_concurrently", False)
+    python_threads = set()
+    def simulate_in_the_calling_thread(data_series_dict):
+        python_threads.add(threading.get_ident())
+        return simulation_counter.simulate(data_series_dict)
+    monkeypatch.setitem(JSONRecordCreator.local_python_functions_dictionary, "counted_simulation", simulate_in_the_calling_thread)
+    fig_dict = JSONRecordCreator.simulate_as_needed_in_fig_dict(make_fig_dict_to_simulate(["local_python", "https://example.com/simulator.js"] * 3))
+    assert python_threads == {threading.get_ident()}
+    assert [data_series["y"][0] for data_series in fig_dict["data"]] == list(range(6))
@@ -0,0 +1,59 @@
+import io
+import json
+
+import numpy as np
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+
+csv_header = ("comments: A csv record,,\nDataType: Test_Data,,\nChart_label: The title,,\nx_label: Time (s),,\ny_label: Distance (m),,\n"
+              "series_names: a, b,,\ncustom_variables:,,\nx_values,y_1,y_2\n")
+
+
+def write_csv_file(tmp_path, data_text, delimiter=",", extension=".csv"):
+    filename = tmp_path / ("record" + extension)
+    filename.write_text(csv_header.replace(",", delimiter) + data_text)
+    return str(filename)
+
+
+def test_csv_import_reads_the_header_and_columns(tmp_path):
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.import_from_file(write_csv_file(tmp_path, "1,2,3\n2,4,6\n3,8,9\n"))
+    assert record.fig_dict["datatype"] == "Test_Data"
+    assert record.fig_dict["layout"]["title"]["text"] == "The title"
+    assert record.fig_dict["layout"]["xaxis"]["title"]["text"] == "Time (s)"
+    assert [data_series["name"] for data_series in record.fig_dict["data"]] == ["a", "b"]
+    assert record.fig_dict["data"][0]["x"] == [1.0, 2.0, 3.0]
+    assert record.fig_dict["data"][1]["y"] == [3.0, 6.0, 9.0]
+    assert record.fig_dict["data"][0]["x"] is not record.fig_dict["data"][1]["x"]
+
+
+def test_tsv_import_matches_csv_import(tmp_path):
+    csv_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    csv_record.import_from_file(write_csv_file(tmp_path, "1,2,3\n2,4,6\n"))
+    tsv_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    tsv_record.import_from_file(write_csv_file(tmp_path, "1\t2\t3\n2\t4\t6\n", delimiter="\t", extension=".tsv"))
+    assert tsv_record.fig_dict["data"] == csv_record.fig_dict["data"]
+
+
+def test_missing_values_blank_lines_and_short_rows_become_none(tmp_path):
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.import_from_file(write_csv_file(tmp_path, "1,2,3\n\n2,,4\n3,5\n4,6,7,\n\n\n"))
+    assert record.fig_dict["data"][0]["x"] == [1.0, 2.0, 3.0, 4.0]
+    assert record.fig_dict["data"][0]["y"] == [2.0, None, 5.0, 6.0]
+    assert record.fig_dict["data"][1]["y"] == [3.0, 4.0, None, 7.0]
+    json.loads(json.dumps(record.fig_dict, allow_nan=False)) #the record can be written as valid json.
+
+
+def test_chunks_give_the_same_columns_as_one_read():
+    data_text = "".join(f"{index},{index*0.5},{-index}\n" for index in range(1000)) + "1000,,\n"
+    one_read_columns = JSONRecordCreator.read_numeric_columns_from_delimited_file(io.StringIO(data_text), minimum_number_of_columns=3)
+    chunked_columns = JSONRecordCreator.read_numeric_columns_from_delimited_file(io.StringIO(data_text), minimum_number_of_columns=3, chunk_size=64)
+    for one_read_column, chunked_column in zip(one_read_columns, chunked_columns):
+        np.testing.assert_array_equal(one_read_column, chunked_column)
+    assert len(chunked_columns[0]) == 1001
+    assert np.isnan(chunked_columns[1][-1])
+
+
+def test_list_with_nan_as_none():
+    assert JSONRecordCreator.get_list_with_nan_as_none(np.array([1.0, np.nan, 3.0])) == [1.0, None, 3.0]
+    assert JSONRecordCreator.get_list_with_nan_as_none(np.array([1.0, 2.0])) == [1.0, 2.0]
@@ -0,0 +1,43 @@
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+def test_content_hash_depends_on_the_values_and_name():
+    data_series = {"name": "a", "x": [1, 2, 3], "y": [4, 5, 6]}
+    content_hash = JSONRecordCreator.get_data_series_content_hash(data_series)
+    assert JSONRecordCreator.get_data_series_content_hash({"name": "a", "x": [1.0, 2.0, 3.0], "y": [4.0, 5.0, 6.0], "mode": "lines"}) == content_hash
+    assert JSONRecordCreator.get_data_series_content_hash({"name": "a", "x": [1, 2, 3], "y": [4, 5, 7]}) != content_hash
+    assert JSONRecordCreator.get_data_series_content_hash({"name": "b", "x": [1, 2, 3], "y": [4, 5, 6]}) != content_hash
+    assert JSONRecordCreator.get_data_series_content_hash({"name": "a", "x": ["a", "b"], "y": [4, 5]}) != content_hash
+
+
+@pytest.mark.parametrize("duplicate_series, expected_number_of_series", [("keep", 3), ("skip", 2), ("flag", 3)])
+def test_merge_with_duplicate_series(duplicate_series, expected_number_of_series):
+    first_record = make_simple_record()
+    second_record = make_simple_record() #the same data series as the first record.
+    second_record.add_data_series("series_2", [1, 2], [3, 4])
+    merged_record = JSONRecordCreator.merge_JSONGrapherRecords([first_record, second_record], duplicate_series=duplicate_series)
+    assert len(merged_record.fig_dict["data"]) == expected_number_of_series
+
+
+def test_duplicates_are_found_after_unit_scaling():
+    first_record = make_simple_record(y_values=[1000, 2000, 3000])
+    second_record = make_simple_record(y_values=[1, 2, 3])
+    second_record.set_y_axis_label_including_units("Pressure (kPa)")
+    merged_record = JSONRecordCreator.merge_JSONGrapherRecords([first_record, second_record], duplicate_series="skip")
+    assert len(merged_record.fig_dict["data"]) == 1
+
+
+def test_cached_hashes_follow_edits_of_the_series():
+    merged_record = make_simple_record()
+    merged_record.get_data_series_content_hashes()
+    merged_record.fig_dict["data"][0]["y"] = [7, 8, 9]
+    merged_record.append_data_series_list([{"name": "series_1", "x": [1, 2, 3], "y": [4, 5, 6]}], duplicate_series="skip")
+    assert len(merged_record.fig_dict["data"]) == 2
+
+
+def test_unknown_duplicate_series_option():
+    with pytest.raises(ValueError):
+        make_simple_record().append_data_series_list([], duplicate_series="drop")
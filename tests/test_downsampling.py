@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+@pytest.mark.parametrize("downsampling_method", JSONRecordCreator.downsampling_methods)
+def test_never_more_points_than_the_budget(downsampling_method):
+    random_generator = np.random.default_rng(0)
+    for number_of_points in [1, 2, 3, 4, 5, 10, 57]:
+        x_array = np.arange(number_of_points, dtype=np.float64)
+        y_array = random_generator.normal(size=number_of_points)
+        y_array_with_gaps = y_array.copy()
+        y_array_with_gaps[random_generator.random(number_of_points) < 0.3] = np.nan
+        for max_points_per_series in range(0, number_of_points + 2):
+            for y_values in [y_array, y_array_with_gaps]:
+                indices = JSONRecordCreator.get_downsampling_indices(x_array, y_values, max_points_per_series, downsampling_method)
+                assert len(indices) <= max(max_points_per_series, 0)
+                assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize("downsampling_method", JSONRecordCreator.downsampling_methods)
+def test_end_points_and_range_are_kept(downsampling_method):
+    x_array = np.linspace(0, 10, 10000)
+    y_array = np.sin(x_array)
+    y_array[1234] = 50.0 #a spike.
+    indices = JSONRecordCreator.get_downsampling_indices(x_array, y_array, 100, downsampling_method)
+    assert (indices[0], indices[-1]) == (0, 9999)
+    assert 1234 in indices
+    if downsampling_method == "minmax":
+        assert np.argmin(y_array) in indices
+
+
+def test_one_nan_point_is_kept_per_gap():
+    x_array = np.arange(1000, dtype=np.float64)
+    y_array = np.cos(x_array / 50)
+    y_array[300:310] = np.nan
+    y_array[700] = np.nan
+    indices = JSONRecordCreator.get_downsampling_indices(x_array, y_array, 50, "lttb")
+    kept_nan_indices = [index for index in indices if np.isnan(y_array[index])]
+    assert kept_nan_indices == [300, 700]
+    assert len(indices) <= 50
+
+
+def test_small_budgets_keep_the_end_points():
+    assert list(JSONRecordCreator.get_lttb_indices(np.arange(10.0), np.arange(10.0), 2)) == [0, 9]
+    assert list(JSONRecordCreator.get_minmax_indices(np.arange(10.0), 3)) == [0, 9]
+    assert list(JSONRecordCreator.get_minmax_indices(np.arange(10.0), 1)) == [0]
+    assert list(JSONRecordCreator.get_lttb_indices(np.arange(10.0), np.arange(10.0), 0)) == []
+
+
+def test_per_point_lists_are_downsampled_with_the_points():
+    data_series = {"type": "scatter", "name": "a", "x": list(range(100)), "y": [index % 7 for index in range(100)],
+                   "text": [str(index) for index in range(100)], "marker": {"color": list(range(100)), "size": 5}}
+    fig_dict = {"layout": {}, "data": [data_series]}
+    downsampled_data_series = JSONRecordCreator.downsample_fig_dict(fig_dict, 20)["data"][0]
+    assert len(downsampled_data_series["x"]) <= 20
+    assert downsampled_data_series["text"] == [str(x_value) for x_value in downsampled_data_series["x"]]
+    assert downsampled_data_series["marker"] == {"color": downsampled_data_series["x"], "size": 5}
+    assert len(fig_dict["data"][0]["x"]) == 100 #the fig_dict received is not changed.
+    with pytest.raises(ValueError):
+        JSONRecordCreator.downsample_fig_dict(fig_dict, 20, downsampling_method="every_other")
+
+
+def test_plotting_downsamples_only_the_plotted_copy():
+    record = make_simple_record(x_values=list(range(5000)), y_values=[index % 13 for index in range(5000)])
+    fig = record.get_plotly_fig(max_points_per_series=200)
+    assert len(fig.data[0].x) <= 200
+    assert len(record.fig_dict["data"][0]["x"]) == 5000
@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+def is_kaleido_available():
+    try:
+        import kaleido # pylint: disable=unused-import
+        return True
+    except ImportError:
+        return False
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_export_many_writes_each_format_in_order(tmp_path, example_record_filename, workers):
+    fig_dict = make_simple_record().fig_dict
+    records = [example_record_filename, fig_dict, make_simple_record(series_name="from_a_record")]
+    export_results = JSONRecordCreator.export_many(records, formats=["json", "matplotlib_png", "matplotlib_svg"], workers=workers, output_directory=str(tmp_path))
+    assert [(export_result["record_index"], export_result["format"]) for export_result in export_results] == \
+        [(record_index, export_format) for record_index in range(3) for export_format in ["json", "matplotlib_png", "matplotlib_svg"]]
+    assert [export_result["error"] for export_result in export_results] == [None] * 9
+    assert export_results[0]["filename"] == str(tmp_path / "LaFeO3.json")
+    assert export_results[4]["filename"] == str(tmp_path / "record_1.png")
+    for export_result in export_results:
+        assert os.path.getsize(export_result["filename"]) > 0
+        assert export_result["seconds"] >= 0
+    with open(str(tmp_path / "record_2.json"), "r", encoding="utf-8") as json_file:
+        assert json.load(json_file)["data"][0]["name"] == "from_a_record"
+
+
+def test_export_many_does_not_change_the_records(tmp_path):
+    record = make_simple_record()
+    fig_dict = make_simple_record().fig_dict
+    fig_dict["data"][0]["trace_style"] = "scatter__rainbow"
+    record_text, fig_dict_text = json.dumps(record.fig_dict), json.dumps(fig_dict)
+    JSONRecordCreator.export_many([record, fig_dict], formats=["matplotlib_png", "json"], workers=1, output_directory=str(tmp_path))
+    assert json.dumps(record.fig_dict) == record_text
+    assert json.dumps(fig_dict) == fig_dict_text
+
+
+def test_failures_are_returned_for_each_format(tmp_path):
+    export_results = JSONRecordCreator.export_many([str(tmp_path / "missing.json"), make_simple_record().fig_dict], formats=["json", "matplotlib_png"],
+                                                   workers=1, output_directory=str(tmp_path))
+    assert [export_result["error"] is None for export_result in export_results] == [False, False, True, True]
+    if not is_kaleido_available():
+        export_results = JSONRecordCreator.export_many([make_simple_record()], formats="plotly_png", workers=1, output_directory=str(tmp_path))
+        assert export_results[0]["error"] is not None
+        assert not os.path.exists(export_results[0]["filename"])
+
+
+def test_export_many_of_a_directory(tmp_path):
+    make_simple_record().export_to_json_file(str(tmp_path / "b.json"))
+    make_simple_record().export_to_json_file(str(tmp_path / "a.json.gz"))
+    (tmp_path / "notes.txt").write_text("not a record")
+    export_results = JSONRecordCreator.export_many(str(tmp_path), workers=1)
+    assert [export_result["filename"] for export_result in export_results] == [str(tmp_path / "a.png"), str(tmp_path / "b.png")]
+    assert JSONRecordCreator.export_many([], formats="json") == []
+    with pytest.raises(ValueError):
+        JSONRecordCreator.export_many([make_simple_record()], formats=["gif"])
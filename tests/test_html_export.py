@@ -0,0 +1,67 @@
+import json
+import os
+import re
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+def get_figure_json_texts(html_text):
+    return re.findall(r"^figure = (.*?);(?:figure\.layout\.template = templates\[\d+\];)?Plotly\.newPlot", html_text, flags=re.MULTILINE)
+
+
+def test_pages_share_one_plotlyjs_file(tmp_path):
+    first_record = make_simple_record()
+    first_record.set_graph_title("First title")
+    second_record = make_simple_record(series_name="series_2")
+    second_record.set_graph_title("Second title")
+    html_filenames = JSONRecordCreator.export_to_html([first_record, second_record], output_directory=str(tmp_path), filenames=["first", "second"])
+    assert html_filenames == [str(tmp_path / "first.html"), str(tmp_path / "second.html")]
+    assert sorted(os.listdir(str(tmp_path))) == ["first.html", "plotly.min.js", "second.html"]
+    for html_filename, graph_title in zip(html_filenames, ["First title", "Second title"]):
+        with open(html_filename, "r", encoding="utf-8") as html_file:
+            html_text = html_file.read()
+        assert '<script src="plotly.min.js" charset="utf-8"></script>' in html_text
+        assert "<title>" + graph_title + "</title>" in html_text
+        assert os.path.getsize(html_filename) < os.path.getsize(str(tmp_path / "plotly.min.js")) / 10
+    os.utime(str(tmp_path / "plotly.min.js"), (1, 1))
+    JSONRecordCreator.export_to_html([first_record], output_directory=str(tmp_path), filenames=["third"])
+    assert os.path.getmtime(str(tmp_path / "plotly.min.js")) == 1 #the plotly.js file is not written again.
+
+
+def test_figure_json_in_the_page_matches_the_plotly_figure(tmp_path):
+    record = make_simple_record(series_name="</script><b>")
+    html_filename = record.export_to_html(str(tmp_path / "record.html"))
+    assert html_filename == str(tmp_path / "record.html")
+    with open(html_filename, "r", encoding="utf-8") as html_file:
+        html_text = html_file.read()
+    assert "</script><b>" not in html_text
+    figure_json_texts = get_figure_json_texts(html_text)
+    assert len(figure_json_texts) == 1
+    figure_dict = json.loads(figure_json_texts[0])
+    plotly_fig_dict = record.get_plotly_fig().to_dict()
+    assert figure_dict["data"][0]["name"] == "</script><b>"
+    assert figure_dict["data"][0]["y"] == list(plotly_fig_dict["data"][0]["y"])
+    assert "template" not in figure_dict["layout"] #the template is written separately.
+
+
+def test_single_page_with_many_figures(tmp_path, example_record_filename):
+    records = [make_simple_record(), example_record_filename, make_simple_record(x_values=[7, 8], y_values=[9, 10]).fig_dict]
+    html_filenames = JSONRecordCreator.export_to_html(records, output_directory=str(tmp_path), single_page_filename="all_records")
+    assert html_filenames == [str(tmp_path / "all_records.html")]
+    with open(html_filenames[0], "r", encoding="utf-8") as html_file:
+        html_text = html_file.read()
+    assert len(get_figure_json_texts(html_text)) == 3
+    assert html_text.count('<div id="jsongrapher_figure_') == 3
+    assert html_text.count("figure.layout.template = templates[0];") == 3 #one shared template.
+    assert "<title>JSONGrapher records</title>" in html_text
+
+
+def test_plotlyjs_options(tmp_path):
+    import plotly.offline
+    record = make_simple_record()
+    for plotlyjs, expected_text in [("cdn", "https://cdn.plot.ly/plotly-"), ("js/plotly.js", '<script src="js/plotly.js"'), ("embed", plotly.offline.get_plotlyjs()[:200])]:
+        html_filename = record.export_to_html(str(tmp_path / plotlyjs.replace("/", "_")), plotlyjs=plotlyjs)
+        with open(html_filename, "r", encoding="utf-8") as html_file:
+            assert expected_text in html_file.read()
+    assert "plotly.min.js" not in os.listdir(str(tmp_path))
@@ -0,0 +1,52 @@
+import copy
+import os
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record, drag_and_drop_examples_directory
+
+
+def test_merge_scales_the_merged_in_series_to_the_first_record_units():
+    first_record = make_simple_record()
+    second_record = make_simple_record(x_values=[1, 2], y_values=[1, 2], series_name="series_2")
+    second_record.set_y_axis_label_including_units("Pressure (kPa)")
+    merged_record = JSONRecordCreator.merge_JSONGrapherRecords([first_record, second_record])
+    assert [data_series["name"] for data_series in merged_record.fig_dict["data"]] == ["series_1", "series_2"]
+    assert merged_record.fig_dict["data"][1]["y"] == pytest.approx([1000, 2000])
+    assert second_record.fig_dict["data"][0]["y"] == [1, 2] #the record merged in is not changed.
+
+
+def test_merge_in_copies_only_the_new_series():
+    merged_record = make_simple_record()
+    existing_series = merged_record.fig_dict["data"][0]
+    record_to_merge = make_simple_record(series_name="series_2")
+    fig_dict_before = copy.deepcopy(record_to_merge.fig_dict)
+    merged_record.merge_in_JSONGrapherRecord(record_to_merge)
+    assert merged_record.fig_dict["data"][0] is existing_series
+    assert merged_record.fig_dict["data"][1] is not record_to_merge.fig_dict["data"][0]
+    assert record_to_merge.fig_dict == fig_dict_before
+
+
+def test_incremental_merge_matches_merging_all_at_once():
+    filenames = [os.path.join(drag_and_drop_examples_directory, filename) for filename in ["LaFeO3.json", "LaMnO3.json", "SrTiO3_rainbow.json"]]
+    merged_at_once = JSONRecordCreator.merge_JSONGrapherRecords(filenames)
+    merged_incrementally = JSONRecordCreator.merge_JSONGrapherRecords(filenames[:1])
+    for filename in filenames[1:]:
+        merged_incrementally.merge_in_JSONGrapherRecord(filename)
+    assert merged_incrementally.fig_dict["data"] == merged_at_once.fig_dict["data"]
+
+
+def test_dropped_files_are_merged_into_the_first_global_record():
+    filenames = [os.path.join(drag_and_drop_examples_directory, filename) for filename in ["LaFeO3.json", "LaMnO3.json"]]
+    records_list = JSONRecordCreator.global_records_list
+    records_list.clear()
+    try:
+        JSONRecordCreator.add_records_to_global_records_list_and_plot(filenames[:1], filenames[:1], plot_immediately=False)
+        JSONRecordCreator.add_records_to_global_records_list_and_plot(filenames, filenames[1:], plot_immediately=False)
+        assert len(records_list) == 3
+        expected_record = JSONRecordCreator.merge_JSONGrapherRecords(filenames)
+        assert records_list[0].fig_dict["data"] == expected_record.fig_dict["data"]
+        assert records_list[0] is not records_list[1]
+    finally:
+        records_list.clear()
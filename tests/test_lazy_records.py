@@ -0,0 +1,70 @@
+import json
+import pickle
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+@pytest.fixture(params=[".json", ".jgb"])
+def record_filename(request, tmp_path):
+    record = make_simple_record(x_values=range(10), y_values=[index*2 for index in range(10)])
+    record.add_data_series("series_2", list(range(5)), list(range(5, 10)))
+    filename = str(tmp_path / ("record" + request.param))
+    if request.param == ".jgb":
+        record.export_to_binary(filename)
+    else:
+        record.export_to_json_file(filename)
+    return filename
+
+
+def get_eager_fig_dict(filename):
+    eager_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    eager_record.import_from_file(filename)
+    return eager_record.fig_dict
+
+
+def test_lazy_series_are_read_only_when_used(record_filename):
+    lazy_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    lazy_record.import_from_file(record_filename, lazy=True)
+    first_series, second_series = lazy_record.fig_dict["data"]
+    assert isinstance(first_series, JSONRecordCreator.LazyJSONGrapherDataSeries)
+    assert first_series["name"] == "series_1" #the metadata is available without loading.
+    assert not first_series.is_loaded()
+    assert list(second_series["y"]) == [5, 6, 7, 8, 9]
+    assert second_series.is_loaded()
+    assert lazy_record.fig_dict["data"] == get_eager_fig_dict(record_filename)["data"]
+
+
+def test_lazy_json_series_are_read_in_one_pass(tmp_path, monkeypatch):
+    record = make_simple_record()
+    for series_index in range(5):
+        record.add_data_series(f"extra_series_{series_index}", [1, 2], [series_index, series_index])
+    json_filename = str(tmp_path / "record.json")
+    record.export_to_json_file(json_filename)
+    lazy_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    lazy_record.import_from_file(json_filename, lazy=True)
+    number_of_reads = []
+    for function_name in ["read_JSONGrapher_fig_dict_from_json_file", "read_data_series_from_json_file"]:
+        def counting_function(*args, original_function=getattr(JSONRecordCreator, function_name), **kwargs):
+            number_of_reads.append(1)
+            return original_function(*args, **kwargs)
+        monkeypatch.setattr(JSONRecordCreator, function_name, counting_function)
+    assert [data_series["y"] for data_series in lazy_record.fig_dict["data"]][-1] == [4, 4]
+    assert len(number_of_reads) == 1
+
+
+def test_lazy_records_export_and_pickle_like_eager_records(record_filename, tmp_path):
+    lazy_record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    lazy_record.import_from_file(record_filename, lazy=True)
+    lazy_record.export_to_json_file(str(tmp_path / "exported.json"), update_and_validate=False)
+    with open(str(tmp_path / "exported.json"), "r", encoding="utf-8") as json_file:
+        assert json.loads(json_file.read())["data"] == json.loads(json.dumps(get_eager_fig_dict(record_filename)["data"]))
+    unpickled_data_series = pickle.loads(pickle.dumps(lazy_record.fig_dict["data"][0]))
+    assert dict(unpickled_data_series) == dict(get_eager_fig_dict(record_filename)["data"][0])
+
+
+def test_lazy_is_only_for_json_and_jgb_files(tmp_path):
+    with pytest.raises(ValueError):
+        JSONRecordCreator.get_lazy_fig_dict_from_file(str(tmp_path / "record.csv"))
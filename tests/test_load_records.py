@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record, drag_and_drop_examples_directory
+
+example_filenames = [os.path.join(drag_and_drop_examples_directory, filename) for filename in ["LaFeO3.json", "LaMnO3.json", "SrTiO3_rainbow.json", "LaFeO3.json"]]
+
+
+@pytest.mark.parametrize("workers, use_processes", [(None, False), (3, False), (2, True)])
+def test_load_records_keeps_the_order_of_the_paths(workers, use_processes):
+    loaded_records = JSONRecordCreator.load_records(example_filenames, workers=workers, use_processes=use_processes)
+    expected_fig_dicts = [JSONRecordCreator.get_fig_dict_from_record(filename) for filename in example_filenames]
+    assert [loaded_record.fig_dict for loaded_record in loaded_records] == expected_fig_dicts
+
+
+@pytest.mark.parametrize("workers, use_processes", [(None, False), (3, False), (2, True)])
+def test_parallel_merge_matches_serial_merge(workers, use_processes):
+    serial_record = JSONRecordCreator.merge_JSONGrapherRecords(example_filenames)
+    merged_record = JSONRecordCreator.merge_JSONGrapherRecords(example_filenames[:1])
+    JSONRecordCreator.load_records(example_filenames[1:], workers=workers, use_processes=use_processes, merged_record=merged_record)
+    assert merged_record.fig_dict["data"] == serial_record.fig_dict["data"]
+
+
+def test_loaded_series_are_scaled_to_the_merged_record_units():
+    merged_record = make_simple_record()
+    record_to_load = make_simple_record(x_values=[1, 2], y_values=[3, 4], series_name="series_2")
+    record_to_load.set_y_axis_label_including_units("Pressure (kPa)")
+    JSONRecordCreator.load_records([record_to_load.fig_dict], workers=2, merged_record=merged_record)
+    assert merged_record.fig_dict["data"][1]["y"] == pytest.approx([3000, 4000])
+
+
+def test_load_records_reads_the_record_files_of_a_directory():
+    loaded_records = JSONRecordCreator.load_records(drag_and_drop_examples_directory)
+    expected_filenames = [filename for filename in os.listdir(drag_and_drop_examples_directory) if filename.endswith((".json", ".csv", ".tsv"))]
+    assert len(loaded_records) == len(expected_filenames)
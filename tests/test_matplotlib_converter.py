@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import drag_and_drop_examples_directory
+
+
+def get_example_matplotlib_axes(example_filename):
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.import_from_file(os.path.join(drag_and_drop_examples_directory, example_filename))
+    return record.get_matplotlib_fig(fig=JSONRecordCreator.get_reusable_matplotlib_fig()).axes[0]
+
+
+def test_marker_line_and_bar_styles():
+    fig_dict = {"layout": {"title": {"text": "Title"}, "width": 1000, "height": 400, "xaxis": {"title": {"text": "X (K)"}}},
+                "data": [{"type": "scatter", "mode": "markers", "name": "markers", "x": [1, 2, 3], "y": [1, 4, 9], "marker": {"symbol": "square", "size": 10, "color": "red"}},
+                         {"type": "scatter", "mode": "lines", "name": "dashed", "x": [1, 2, 3], "y": [2, 3, 4], "line": {"dash": "dash", "width": 4, "color": "blue"}},
+                         {"type": "scatter", "mode": "lines", "name": "spline", "x": [1, 2, 3, 4], "y": [2, 3, 1, 4], "line": {"shape": "spline"}},
+                         {"type": "bar", "name": "bars", "x": [1, 2, 3], "y": [1, 2, 3]}]}
+    fig = JSONRecordCreator.convert_JSONGrapher_dict_to_matplotlib_fig(fig_dict, use_pyplot=False)
+    ax = fig.axes[0]
+    assert list(fig.get_size_inches() * fig.dpi) == [1000, 400]
+    assert fig._suptitle.get_text() == "Title"
+    assert ax.get_xlabel() == "X (K)"
+    marker_collection = ax.collections[0]
+    assert marker_collection.get_offsets().shape == (3, 2)
+    assert tuple(marker_collection.get_facecolor()[0]) == (1.0, 0.0, 0.0, 1.0)
+    np.testing.assert_allclose(marker_collection.get_paths()[0].vertices[:4], [[-0.5, -0.5], [0.5, -0.5], [0.5, 0.5], [-0.5, 0.5]]) #a square.
+    dashed_line, spline_line = ax.get_lines()
+    assert (dashed_line.get_linestyle(), dashed_line.get_color()) == ("--", "blue")
+    assert dashed_line.get_linewidth() == pytest.approx(4 * 72 / fig.dpi) #plotly pixels as points.
+    assert len(spline_line.get_xdata()) > 100 #the spline is drawn through interpolated points.
+    assert len(ax.containers[0]) == 3
+
+
+def test_bubble_sizes_and_colors():
+    ax = get_example_matplotlib_axes("Rate_Constant_bubble.json")
+    bubble_collection = ax.collections[0]
+    assert len(np.unique(bubble_collection.get_sizes())) > 1
+    assert len(np.unique(bubble_collection.get_array())) > 1 #colored by the colorscale.
+    assert len(ax.figure.axes) == 2 #and the colorbar.
+
+
+@pytest.mark.parametrize("example_filename, collection_type_name", [("Rate_Constant_mesh3d.json", "Poly3DCollection"), ("Rate_Constant_scatter3d.json", "Path3DCollection")])
+def test_3d_records(example_filename, collection_type_name):
+    ax = get_example_matplotlib_axes(example_filename)
+    assert ax.name == "3d"
+    assert type(ax.collections[0]).__name__ == collection_type_name
+    assert ax.get_zlabel() != ""
+
+
+def test_every_example_record_can_be_drawn():
+    for example_filename in ["LaFeO3.json", "SrTiO3_rainbow.json", "O_OH_Scaling.json", "UAN_DTA_6.json", "Combined_Record.json"]:
+        ax = get_example_matplotlib_axes(example_filename)
+        assert len(ax.get_children()) > 0
+        assert ax.get_xlabel() != ""
@@ -0,0 +1,52 @@
+import threading
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+def test_exports_do_not_open_pyplot_figures(tmp_path):
+    import matplotlib.pyplot as plt
+    number_of_open_figures = len(plt.get_fignums())
+    record = make_simple_record()
+    png_bytes = record.export_to_matplotlib_bytes()
+    assert png_bytes.startswith(b"\x89PNG")
+    assert record.export_to_matplotlib_bytes(file_format="svg").lstrip().startswith(b"<?xml")
+    assert record.export_to_matplotlib_bytes(file_format="pdf").startswith(b"%PDF")
+    record.export_to_matplotlib_png(str(tmp_path / "record"))
+    assert (tmp_path / "record.png").read_bytes().startswith(b"\x89PNG")
+    assert len(plt.get_fignums()) == number_of_open_figures
+
+
+def test_reused_figure_draws_like_a_new_figure():
+    first_record = make_simple_record()
+    second_record = make_simple_record(x_values=[10, 20, 30], y_values=[-1, -2, -3], series_name="other_series")
+    first_png_bytes = first_record.export_to_matplotlib_bytes()
+    second_record.export_to_matplotlib_bytes()
+    assert first_record.export_to_matplotlib_bytes() == first_png_bytes
+    fig = JSONRecordCreator.get_reusable_matplotlib_fig()
+    assert fig is JSONRecordCreator.get_reusable_matplotlib_fig()
+    assert len(fig.axes) == 1
+    assert len(fig.axes[0].get_lines()) == 1 #nothing is left from drawing the second record.
+    assert fig.axes[0].get_ylim()[0] > 0
+    new_fig = first_record.get_matplotlib_fig(fig=JSONRecordCreator.get_matplotlib_fig_and_axes(use_pyplot=False)[0])
+    assert JSONRecordCreator.render_matplotlib_fig_to_bytes(new_fig) == first_png_bytes
+
+
+def test_each_thread_has_its_own_figure():
+    thread_figures = []
+    png_bytes_list = []
+    def export_in_thread():
+        thread_figures.append(JSONRecordCreator.get_reusable_matplotlib_fig())
+        png_bytes_list.append(make_simple_record().export_to_matplotlib_bytes())
+    threads = [threading.Thread(target=export_in_thread) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(id(fig) for fig in thread_figures)) == 4
+    assert len(set(png_bytes_list)) == 1
+
+
+def test_dpi_changes_the_image_size():
+    fig = make_simple_record().get_matplotlib_fig(fig=JSONRecordCreator.get_reusable_matplotlib_fig())
+    assert len(JSONRecordCreator.render_matplotlib_fig_to_bytes(fig, dpi=200)) > len(JSONRecordCreator.render_matplotlib_fig_to_bytes(fig, dpi=50))
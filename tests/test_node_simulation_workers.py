@@ -0,0 +1,89 @@
+import shutil
+import threading
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="The javascript simulators need Node.js.")
+
+#A small simulator. It doubles "value", can print to the console (which must not break the responses of the workers), and can be made to fail in different ways.
+simulator_text = """
+const fs = require('fs');
+function simulate(input) {
+    if (input.print) { console.log('simulating', input); }
+    if (input.action === 'throw') { throw new Error('bad input'); }
+    if (input.action === 'loop') { while (true) {} }
+    if (input.action === 'exit_once' && !fs.existsSync(input.marker_filename)) { fs.writeFileSync(input.marker_filename, 'exited'); process.exit(3); }
+    return {value: input.value * 2, pid: process.pid};
+}
+module.exports = { simulate };
+"""
+
+
+@pytest.fixture
+def simulator_filename(tmp_path):
+    js_filename = tmp_path / "simulator.js"
+    js_filename.write_text(simulator_text)
+    return str(js_filename)
+
+
+@pytest.fixture
+def worker_pool():
+    node_simulation_worker_pool = JSONRecordCreator.NodeSimulationWorkerPool(max_workers=2)
+    yield node_simulation_worker_pool
+    node_simulation_worker_pool.close()
+
+
+def test_workers_are_reused(worker_pool, simulator_filename):
+    first_result = worker_pool.simulate(simulator_filename, {"value": 2, "print": True})
+    second_result = worker_pool.simulate(simulator_filename, {"value": 5})
+    assert (first_result["value"], second_result["value"]) == (4, 10)
+    assert first_result["pid"] == second_result["pid"]
+
+
+def test_simulator_errors_and_timeouts(worker_pool, simulator_filename):
+    with pytest.raises(RuntimeError, match="bad input"):
+        worker_pool.simulate(simulator_filename, {"action": "throw"})
+    with pytest.raises(TimeoutError):
+        worker_pool.simulate(simulator_filename, {"action": "loop"}, timeout=1)
+    assert worker_pool.simulate(simulator_filename, {"value": 1})["value"] == 2 #the stopped worker is replaced.
+
+
+def test_a_worker_that_stops_is_replaced_and_the_simulation_run_again(worker_pool, simulator_filename, tmp_path):
+    first_pid = worker_pool.simulate(simulator_filename, {"value": 1})["pid"]
+    result = worker_pool.simulate(simulator_filename, {"action": "exit_once", "marker_filename": str(tmp_path / "marker.txt"), "value": 3})
+    assert result["value"] == 6
+    assert result["pid"] != first_pid
+
+
+def test_at_most_max_workers_run_at_once(worker_pool, simulator_filename):
+    pids = []
+    def simulate_in_thread(value):
+        pids.append(worker_pool.simulate(simulator_filename, {"value": value})["pid"])
+    threads = [threading.Thread(target=simulate_in_thread, args=(value,)) for value in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(pids) == 8
+    assert len(set(pids)) <= 2
+
+
+def test_run_js_simulation_with_and_without_the_worker_pool(simulator_filename, monkeypatch):
+    monkeypatch.setattr(JSONRecordCreator, "get_cached_simulator_filename", lambda javascript_simulator_url, verbose=False: simulator_filename)
+    try:
+        for use_node_simulation_workers in [True, False]:
+            monkeypatch.setattr(JSONRecordCreator, "use_node_simulation_workers", use_node_simulation_workers)
+            assert JSONRecordCreator.run_js_simulation("https://raw.example.com/simulator.js", {"value": 21})["value"] == 42
+    finally:
+        JSONRecordCreator.close_node_simulation_worker_pool()
+
+
+def test_node_simulation_worker_count(monkeypatch):
+    monkeypatch.setattr(JSONRecordCreator, "node_simulation_worker_count", 3)
+    assert JSONRecordCreator.get_node_simulation_worker_count() == 3
+    monkeypatch.setattr(JSONRecordCreator, "node_simulation_worker_count", 0)
+    assert JSONRecordCreator.get_node_simulation_worker_count() == 1
+    monkeypatch.setattr(JSONRecordCreator, "node_simulation_worker_count", None)
+    assert 1 <= JSONRecordCreator.get_node_simulation_worker_count() <= 8
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+@pytest.mark.parametrize("values, expected_statistics", [
+    ([3, 1, 2], {"min": 1, "max": 3, "count": 3, "nan_count": 0}),
+    ([3.5, None, -1.0, float("nan")], {"min": -1.0, "max": 3.5, "count": 2, "nan_count": 2}),
+    ([None, None], {"min": None, "max": None, "count": 0, "nan_count": 2}),
+    (["b", "a", None], {"min": "a", "max": "b", "count": 2, "nan_count": 1}),
+    (np.array([2.0, np.nan, 5.0]), {"min": 2.0, "max": 5.0, "count": 2, "nan_count": 1}),
+])
+def test_data_values_statistics(values, expected_statistics):
+    assert JSONRecordCreator.get_data_values_statistics(values) == expected_statistics
+
+
+def test_statistics_are_cached_until_the_series_changes():
+    data_series = make_simple_record().fig_dict["data"][0]
+    assert data_series.get_statistics("y")["max"] == 6
+    assert data_series.get_cached_statistics("y") is not None
+    data_series["y"] = [10, 20, 30]
+    assert data_series.get_cached_statistics("y") is None
+    assert data_series.get_statistics("y")["max"] == 30
+
+
+def test_added_points_update_the_cached_statistics():
+    data_series = make_simple_record().fig_dict["data"][0]
+    data_series.get_statistics("x")
+    data_series.add_data_point(-5, None)
+    assert data_series.get_cached_statistics("x") == {"min": -5, "max": 3, "count": 4, "nan_count": 0}
+    assert data_series.get_statistics("y") == JSONRecordCreator.get_data_values_statistics([4, 5, 6, None])
+
+
+def test_fig_dict_ranges_with_plain_and_class_data_series():
+    record = make_simple_record(x_values=[5, 1, None], y_values=[2, float("nan"), -3])
+    record.fig_dict["data"].append({"name": "plain", "x": [10, 0], "y": [7, 8]})
+    record.fig_dict["data"].append({"name": "equation", "equation": {"x_range_default": [-20, 20]}, "x": [], "y": []})
+    fig_dict_ranges, data_series_ranges = JSONRecordCreator.get_fig_dict_ranges(record.fig_dict)
+    assert fig_dict_ranges == {"min_x": -20, "max_x": 20, "min_y": -3, "max_y": 8}
+    assert data_series_ranges["min_x"] == [1, 0, -20]
+    fig_dict_ranges = JSONRecordCreator.get_fig_dict_ranges(record.fig_dict, skip_equations=True)[0]
+    assert (fig_dict_ranges["min_x"], fig_dict_ranges["max_x"]) == (0, 10)
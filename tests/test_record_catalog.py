@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    record_catalog = JSONRecordCreator.RecordCatalog(str(tmp_path / "catalog.sqlite"))
+    yield record_catalog
+    record_catalog.close()
+
+
+@pytest.fixture
+def records_directory(tmp_path):
+    directory = tmp_path / "records"
+    directory.mkdir()
+    kelvin_record = make_simple_record(x_values=[300, 400], y_values=[1, 2], series_name="kelvin_series")
+    kelvin_record.export_to_json_file(str(directory / "kelvin.json"))
+    kilopascal_record = make_simple_record(x_values=[1, 2], y_values=[1, 2], series_name="kilopascal_series")
+    kilopascal_record.set_x_axis_label_including_units("Pressure (kPa)")
+    kilopascal_record.export_to_json_file(str(directory / "kilopascal.json"))
+    other_record = make_simple_record(series_name="other_series")
+    other_record.set_datatype("Other_Data")
+    other_record.export_to_binary(str(directory / "other.jgb"))
+    return directory
+
+
+def test_scan_only_reads_new_and_changed_files(catalog, records_directory):
+    assert catalog.scan(str(records_directory)) == {"added": 3, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    assert catalog.scan(str(records_directory))["unchanged"] == 3
+    os.utime(str(records_directory / "kelvin.json"), (1, 1)) #touched, but not changed.
+    assert catalog.scan(str(records_directory))["unchanged"] == 3
+    changed_record = make_simple_record(x_values=[1, 2, 3, 4], y_values=[1, 2, 3, 4], series_name="kelvin_series")
+    changed_record.export_to_json_file(str(records_directory / "kelvin.json"))
+    os.utime(str(records_directory / "kelvin.json"), (2, 2))
+    assert catalog.scan(str(records_directory))["updated"] == 1
+    assert catalog.get_record_summary(str(records_directory / "kelvin.json"))["number_of_points"] == 4
+
+
+def test_files_that_are_removed_or_can_no_longer_be_read_leave_the_catalog(catalog, records_directory):
+    catalog.scan(str(records_directory))
+    os.remove(str(records_directory / "kilopascal.json"))
+    (records_directory / "kelvin.json").write_text("{not json")
+    os.utime(str(records_directory / "kelvin.json"), (3, 3))
+    scan_counts = catalog.scan(str(records_directory))
+    assert (scan_counts["removed"], scan_counts["failed"]) == (1, 1)
+    assert catalog.get_record_summary(str(records_directory / "kelvin.json")) is None
+    assert catalog.query(series_name="kelvin_series") == []
+    assert catalog.query() == [str(records_directory / "other.jgb")]
+
+
+def test_queries_by_datatype_series_name_and_range_with_units(catalog, records_directory):
+    catalog.scan(str(records_directory))
+    kelvin_filename = str(records_directory / "kelvin.json")
+    kilopascal_filename = str(records_directory / "kilopascal.json")
+    assert catalog.query(datatype="Other_Data") == [str(records_directory / "other.jgb")]
+    assert catalog.query(series_name="kelvin_series") == [kelvin_filename]
+    assert catalog.query(x_range=[350, 360], x_units="K") == [kelvin_filename]
+    assert catalog.query(x_range=[1500, 1600], x_units="Pa") == [kilopascal_filename]
+    assert catalog.query(x_range=[5000, 6000], x_units="Pa") == []
+    summary_dict = catalog.get_record_summary(kelvin_filename)
+    assert (summary_dict["x_min"], summary_dict["x_max"], summary_dict["x_units"]) == (300, 400, "K")
+    assert summary_dict["series"][0]["name"] == "kelvin_series"
+
+
+def test_merge_and_lazy_records_of_a_query(catalog, records_directory):
+    catalog.scan(str(records_directory))
+    merged_record = catalog.merge(x_range=[0, 1000], x_units="K")
+    assert [data_series["name"] for data_series in merged_record.fig_dict["data"]] == ["kelvin_series", "other_series"]
+    assert catalog.merge(datatype="Missing_Data") is None
+    lazy_records = catalog.get_lazy_records(series_name="kelvin_series")
+    assert list(lazy_records[0].fig_dict["data"][0]["x"]) == [300, 400]
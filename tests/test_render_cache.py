@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip("plotly")
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+def test_data_series_version_changes_when_edited():
+    record = make_simple_record()
+    data_series = record.fig_dict["data"][0]
+    first_version = data_series.get_version()
+    data_series["y"] = [7, 8, 9]
+    second_version = data_series.get_version()
+    data_series.mark_modified()
+    assert first_version < second_version < data_series.get_version()
+
+
+def test_cache_is_not_used_by_default(simple_record):
+    first_fig = simple_record.get_plotly_fig()
+    simple_record.fig_dict["data"][0]["y"][1] = -5 #an in-place edit, which the cache would not see without mark_modified.
+    second_fig = simple_record.get_plotly_fig()
+    assert list(first_fig.data[0].y) == [4, 5, 6]
+    assert list(second_fig.data[0].y) == [4, -5, 6]
+
+
+def test_cached_figure_matches_uncached_figure(example_record_filename):
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.import_from_file(example_record_filename)
+    uncached_fig = record.get_plotly_fig(use_cache=False)
+    cached_fig = record.get_plotly_fig(use_cache=True)
+    assert cached_fig.to_dict() == uncached_fig.to_dict()
+    assert record.get_plotly_fig(use_cache=True).to_dict() == uncached_fig.to_dict()
+
+
+def test_cached_figures_are_new_objects(simple_record):
+    first_fig = simple_record.get_plotly_fig(use_cache=True)
+    first_fig.update_layout(title_text="Changed")
+    first_fig.data[0].y = [0, 0, 0]
+    second_fig = simple_record.get_plotly_fig(use_cache=True)
+    assert second_fig is not first_fig
+    assert list(second_fig.data[0].y) == [4, 5, 6]
+    assert second_fig.layout.title.text != "Changed"
+
+
+def test_cache_sees_replaced_lists_and_marked_edits():
+    record = make_simple_record(x_values=range(100), y_values=range(100))
+    record.get_plotly_fig(use_cache=True)
+    record.fig_dict["data"][0]["y"] = list(range(100, 200))
+    assert record.get_plotly_fig(use_cache=True).data[0].y[0] == 100
+    record.fig_dict["data"][0]["y"][50] = -7
+    record.mark_modified("data", data_series_index=0)
+    assert record.get_plotly_fig(use_cache=True).data[0].y[50] == -7
+
+
+def test_cache_sees_marked_edits_of_imported_series(example_record_filename):
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.import_from_file(example_record_filename)
+    record.get_plotly_fig(use_cache=True)
+    record.fig_dict["data"][0]["y"][0] = 12345.0
+    record.mark_modified("data")
+    assert record.get_plotly_fig(use_cache=True).data[0].y[0] == 12345.0
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_plotting_does_not_change_the_exported_json(example_record_filename, tmp_path, use_cache):
+    record = JSONRecordCreator.create_new_JSONGrapherRecord()
+    record.import_from_file(example_record_filename)
+    record.export_to_json_file(str(tmp_path / "before.json"))
+    record.get_plotly_fig(use_cache=use_cache)
+    record.export_to_json_file(str(tmp_path / "after.json"))
+    assert (tmp_path / "before.json").read_text() == (tmp_path / "after.json").read_text()
+    assert all(type(data_series) is dict for data_series in record.fig_dict["data"])
+
+
+def test_unchanged_equation_series_are_not_evaluated_again(monkeypatch):
+    pytest.importorskip("json_equationer")
+    record = make_simple_record(x_values=range(300, 400), y_values=[0.001*index for index in range(100)])
+    equation_dict = {"equation_string": "k = A*T", "x_variable": "T (K)", "y_variable": "k (s**(-1))",
+                     "constants": {"A": "2 (s**(-1))*(K**(-1))"}, "num_of_points": 10, "x_range_default": [200, 500],
+                     "x_range_limits": [], "points_spacing": "Linear", "reverse_scaling": False}
+    record.set_y_axis_label_including_units("k (s**(-1))")
+    record.add_data_series_as_equation("equation", 2, equation_dict=equation_dict)
+    evaluated_indices = []
+    original_function = JSONRecordCreator.evaluate_equation_for_data_series_by_index
+    def counting_function(fig_dict, data_series_index, *args, **kwargs):
+        evaluated_indices.append(data_series_index)
+        return original_function(fig_dict, data_series_index, *args, **kwargs)
+    monkeypatch.setattr(JSONRecordCreator, "evaluate_equation_for_data_series_by_index", counting_function)
+    record.get_plotly_fig(use_cache=True)
+    number_of_evaluations = len(evaluated_indices)
+    assert number_of_evaluations > 0
+    record.fig_dict["data"][0].set_marker_size(4) #a style change of the other series does not change the equation inputs.
+    record.get_plotly_fig(use_cache=True)
+    assert len(evaluated_indices) == number_of_evaluations
+    record.fig_dict["data"][1]["equation"]["num_of_points"] = 5
+    fig = record.get_plotly_fig(use_cache=True)
+    assert len(evaluated_indices) > number_of_evaluations
+    assert len(fig.data[1].x) == 5
@@ -0,0 +1,91 @@
+import os
+import sys
+import types
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+
+simulator_url = "https://example.com/simulators/Langmuir_Isotherm.js"
+simulator_text = "function simulate(data) { return data; }"
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers if headers is not None else {}
+
+
+#A fake requests module that records the headers of each request and answers from a list of responses, or raises the error of an exception in the list.
+@pytest.fixture
+def fake_requests(monkeypatch, tmp_path):
+    fake_requests_module = types.SimpleNamespace(responses=[], requests_headers=[])
+    def get(url, headers=None, timeout=None):
+        fake_requests_module.requests_headers.append(dict(headers))
+        response = fake_requests_module.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    fake_requests_module.get = get
+    monkeypatch.setitem(sys.modules, "requests", fake_requests_module)
+    monkeypatch.setattr(JSONRecordCreator, "simulator_cache_directory", str(tmp_path / "simulator_cache"))
+    monkeypatch.setattr(JSONRecordCreator, "simulator_cache_max_age_seconds", 300)
+    monkeypatch.setattr(JSONRecordCreator, "simulator_cache_offline", False)
+    return fake_requests_module
+
+
+def test_simulators_are_downloaded_once(fake_requests):
+    fake_requests.responses.append(FakeResponse(200, simulator_text, {"ETag": '"v1"'}))
+    js_filename = JSONRecordCreator.get_cached_simulator_filename(simulator_url)
+    with open(js_filename, "r", encoding="utf-8") as js_file:
+        assert js_file.read() == simulator_text + "\nmodule.exports = { simulate };"
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url) == js_filename
+    assert len(fake_requests.requests_headers) == 1 #the second call is within the max age, so the URL is not checked.
+    assert [filename for filename in os.listdir(os.path.dirname(js_filename)) if filename.startswith(".tmp_")] == []
+
+
+def test_old_cached_simulators_are_checked_with_conditional_requests(fake_requests, monkeypatch):
+    monkeypatch.setattr(JSONRecordCreator, "simulator_cache_max_age_seconds", 0)
+    fake_requests.responses.extend([FakeResponse(200, simulator_text, {"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT"}),
+                                    FakeResponse(304),
+                                    FakeResponse(200, simulator_text + " //version 2", {"ETag": '"v2"'})])
+    first_js_filename = JSONRecordCreator.get_cached_simulator_filename(simulator_url)
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url) == first_js_filename
+    assert fake_requests.requests_headers[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 19 Oct 2026 00:00:00 GMT"}
+    second_js_filename = JSONRecordCreator.get_cached_simulator_filename(simulator_url)
+    assert second_js_filename != first_js_filename
+    assert os.path.isfile(first_js_filename) #a version that may still be running elsewhere is not changed.
+
+
+def test_cached_simulators_are_used_offline_or_when_the_network_fails(fake_requests, monkeypatch):
+    fake_requests.responses.append(FakeResponse(200, simulator_text))
+    js_filename = JSONRecordCreator.get_cached_simulator_filename(simulator_url)
+    monkeypatch.setattr(JSONRecordCreator, "simulator_cache_max_age_seconds", 0)
+    fake_requests.responses.extend([OSError("no network"), FakeResponse(500)])
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url) == js_filename
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url) == js_filename
+    monkeypatch.setattr(JSONRecordCreator, "simulator_cache_offline", True)
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url) == js_filename
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url + "?other") is None
+    assert len(fake_requests.requests_headers) == 3 #no requests are made offline.
+
+
+def test_missing_simulators_that_cannot_be_downloaded(fake_requests):
+    fake_requests.responses.extend([FakeResponse(404), OSError("no network")])
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url) is None
+    assert JSONRecordCreator.get_cached_simulator_filename(simulator_url) is None
+
+
+def test_atomic_writes_leave_no_partial_files(tmp_path):
+    filename = str(tmp_path / "file.txt")
+    JSONRecordCreator.write_file_atomically(filename, "first")
+    JSONRecordCreator.write_file_atomically(filename, "second")
+    with open(filename, "r", encoding="utf-8") as file:
+        assert file.read() == "second"
+    with pytest.raises(TypeError):
+        JSONRecordCreator.write_file_atomically(filename, None)
+    with open(filename, "r", encoding="utf-8") as file:
+        assert file.read() == "second"
+    assert os.listdir(str(tmp_path)) == ["file.txt"]
@@ -0,0 +1,95 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+
+
+def get_polyfit_rolling_fit(x_values, y_values, window_size, degree, num_interpolated_points):
+    #the point by point version of rolling_polynomial_fit, with numpy.polyfit. x is centered in each window, since numpy.polyfit
+    #only scales x, which is not accurate enough for x values far from zero. Every window here has more points than coefficients.
+    smoothed_x, smoothed_y = [], []
+    half_window = window_size // 2
+    for index in range(len(y_values) - 1):
+        left_bound = max(0, index - half_window)
+        right_bound = min(len(y_values), index + half_window + 1)
+        if index == 0:
+            right_bound = min(len(y_values), window_size)
+        elif index == len(y_values) - 2:
+            left_bound = max(0, index - (window_size - 1))
+        x_window, y_window = np.array(x_values[left_bound:right_bound]), np.array(y_values[left_bound:right_bound])
+        poly_coeffs = np.polyfit(x_window - x_window.mean(), y_window, deg=degree if len(x_window) > 2 else 1)
+        x_interp = np.linspace(x_values[index], x_values[index + 1], num_interpolated_points + 2)
+        smoothed_x.extend(x_interp)
+        smoothed_y.extend(np.polyval(poly_coeffs, x_interp - x_window.mean()))
+    return smoothed_x, smoothed_y
+
+
+@pytest.mark.parametrize("window_size, degree, num_interpolated_points", [(3, 2, 0), (3, 2, 3), (5, 3, 2), (2, 2, 1), (7, 4, 1)])
+def test_rolling_polynomial_fit_matches_polyfit(window_size, degree, num_interpolated_points):
+    random_generator = np.random.default_rng(0)
+    x_values = list(np.cumsum(random_generator.uniform(0.1, 2.0, 40)) + 1000.0)
+    y_values = list(np.sin(np.array(x_values)) + random_generator.normal(0, 0.1, 40))
+    smoothed_x, smoothed_y = JSONRecordCreator.rolling_polynomial_fit(x_values, y_values, window_size=window_size, degree=degree, num_interpolated_points=num_interpolated_points)
+    expected_x, expected_y = get_polyfit_rolling_fit(x_values, y_values, window_size, degree, num_interpolated_points)
+    np.testing.assert_allclose(smoothed_x, expected_x)
+    np.testing.assert_allclose(smoothed_y, expected_y, rtol=1e-7, atol=1e-9)
+
+
+def test_rolling_polynomial_fit_with_fewer_points_than_coefficients():
+    #numpy.polyfit gives the minimum norm fit of its scaled columns, without centering x, and so should rolling_polynomial_fit.
+    x_values = [0.5, 1.0, 2.0, 2.5, 4.0, 5.5]
+    y_values = [1.0, 2.0, 0.5, 1.5, 3.0, 2.0]
+    smoothed_y = JSONRecordCreator.rolling_polynomial_fit(x_values, y_values, window_size=3, degree=4, num_interpolated_points=1)[1]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        poly_coeffs = np.polyfit(x_values[0:3], y_values[0:3], deg=4) #the window of the second segment.
+    np.testing.assert_allclose(smoothed_y[3:6], np.polyval(poly_coeffs, [1.0, 1.5, 2.0]))
+
+
+@pytest.mark.parametrize("number_of_equations", [1, 2, 3, 4, 5, 8, 17, 100])
+def test_tridiagonal_system_matches_dense_solve(number_of_equations):
+    random_generator = np.random.default_rng(number_of_equations)
+    lower = random_generator.uniform(0.1, 1.0, number_of_equations)
+    upper = random_generator.uniform(0.1, 1.0, number_of_equations)
+    diagonal = lower + upper + random_generator.uniform(1.0, 2.0, number_of_equations)
+    right_hand_side = random_generator.normal(size=number_of_equations)
+    dense_matrix = np.diag(diagonal) + np.diag(lower[1:], -1) + np.diag(upper[:-1], 1)
+    expected_solution = np.linalg.solve(dense_matrix, right_hand_side)
+    np.testing.assert_allclose(JSONRecordCreator.solve_tridiagonal_system(lower, diagonal, upper, right_hand_side), expected_solution)
+
+
+def test_natural_cubic_spline_passes_through_the_points():
+    x_values = [0.0, 1.0, 2.5, 3.0, 5.0]
+    y_values = [1.0, 3.0, 2.0, None, 4.0]
+    smoothed_x, smoothed_y = JSONRecordCreator.natural_cubic_spline(x_values, y_values, num_interpolated_points=4)
+    assert len(smoothed_x) == 3 * 5 + 1 #the None point is skipped.
+    np.testing.assert_allclose(smoothed_x[::5], [0.0, 1.0, 2.5, 5.0])
+    np.testing.assert_allclose(smoothed_y[::5], [1.0, 3.0, 2.0, 4.0])
+    #a natural spline through points on a line is that line.
+    smoothed_x, smoothed_y = JSONRecordCreator.natural_cubic_spline([0, 1, 3, 4], [1, 3, 7, 9])
+    np.testing.assert_allclose(smoothed_y, 2 * smoothed_x + 1)
+    assert len(smoothed_x) >= 1000
+
+
+def test_natural_cubic_spline_second_derivatives_are_continuous():
+    knots = np.array([0.0, 0.5, 2.0, 3.0, 4.5])
+    values = np.array([0.0, 1.0, -1.0, 2.0, 0.5])
+    second_derivatives = JSONRecordCreator.get_natural_cubic_spline_second_derivatives(knots, values)
+    assert (second_derivatives[0], second_derivatives[-1]) == (0.0, 0.0)
+    #the slopes at each inner knot from the left and right segments are equal.
+    intervals = np.diff(knots)
+    slopes = np.diff(values) / intervals
+    slopes_from_left = slopes[:-1] + intervals[:-1] * (2 * second_derivatives[1:-1] + second_derivatives[:-2]) / 6
+    slopes_from_right = slopes[1:] - intervals[1:] * (2 * second_derivatives[1:-1] + second_derivatives[2:]) / 6
+    np.testing.assert_allclose(slopes_from_left, slopes_from_right)
+
+
+def test_parametric_spline_for_points_that_go_back_in_x():
+    x_values = [0, 1, 1, 0, 0]
+    y_values = [0, 0, 1, 1, 0.5]
+    smoothed_x, smoothed_y = JSONRecordCreator.natural_cubic_spline(x_values, y_values, num_interpolated_points=9)
+    np.testing.assert_allclose(smoothed_x[::10], x_values)
+    np.testing.assert_allclose(smoothed_y[::10], y_values)
+    assert len(JSONRecordCreator.natural_cubic_spline([0, 1], [0, 1])[0]) == 2
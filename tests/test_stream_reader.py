@@ -0,0 +1,51 @@
+import json
+
+import numpy as np
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import get_example_json_filenames
+
+tricky_fig_dict = {"comments": "Escaped \"quotes\", commas, and brackets [ ] { }",
+                   "data": [{"name": "a", "x": [1, 2, None, 4e5], "y": [1.5, -2, 3, 1e-300], "text": ["a", "b"]},
+                            {"name": "b", "x": [[1, 2], [3]], "y": []}],
+                   "layout": {"title": {"text": "t"}}}
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1048576])
+def test_stream_reader_matches_json_loads_for_the_examples(chunk_size):
+    json_filenames = get_example_json_filenames()
+    assert len(json_filenames) > 10
+    for json_filename in json_filenames:
+        with open(json_filename, "r", encoding="utf-8") as json_file:
+            expected_fig_dict = json.loads(json_file.read())
+        assert JSONRecordCreator.read_JSONGrapher_fig_dict_from_json_file(json_filename, chunk_size=chunk_size) == expected_fig_dict, json_filename
+
+
+@pytest.mark.parametrize("chunk_size", [3, 1048576])
+def test_stream_reader_handles_nulls_nested_lists_and_escapes(tmp_path, chunk_size):
+    json_filename = str(tmp_path / "tricky.json")
+    with open(json_filename, "w", encoding="utf-8") as json_file:
+        json.dump(tricky_fig_dict, json_file, indent=4)
+    assert JSONRecordCreator.read_JSONGrapher_fig_dict_from_json_file(json_filename, chunk_size=chunk_size) == tricky_fig_dict
+
+
+def test_metadata_only_and_data_as_arrays(tmp_path):
+    json_filename = str(tmp_path / "tricky.json")
+    with open(json_filename, "w", encoding="utf-8") as json_file:
+        json.dump(tricky_fig_dict, json_file)
+    metadata_fig_dict = JSONRecordCreator.read_JSONGrapher_fig_dict_from_json_file(json_filename, metadata_only=True)
+    assert metadata_fig_dict["data"][0]["x"] is None
+    assert metadata_fig_dict["data"][0]["text"] == ["a", "b"]
+    assert JSONRecordCreator.get_JSONGrapher_record_metadata(json_filename)["series_names"] == ["a", "b"]
+    arrays_fig_dict = JSONRecordCreator.read_JSONGrapher_fig_dict_from_json_file(json_filename, data_as_arrays=True)
+    np.testing.assert_array_equal(arrays_fig_dict["data"][0]["x"], [1, 2, np.nan, 4e5])
+    assert arrays_fig_dict["data"][1]["x"] == [[1, 2], [3]] #nested lists are not numeric columns.
+
+
+def test_reading_a_single_data_series(tmp_path):
+    json_filename = str(tmp_path / "tricky.json")
+    with open(json_filename, "w", encoding="utf-8") as json_file:
+        json.dump(tricky_fig_dict, json_file)
+    for data_series_index, expected_data_series in enumerate(tricky_fig_dict["data"]):
+        assert JSONRecordCreator.read_data_series_from_json_file(json_filename, data_series_index) == expected_data_series
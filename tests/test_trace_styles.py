@@ -0,0 +1,55 @@
+import copy
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+
+
+def make_data_series(trace_style):
+    return {"name": "a", "x": [1, 2, 3], "y": [4, 5, 6], "z": [7, 8, 9], "trace_style": trace_style, "marker": {"color": "red"}}
+
+
+@pytest.mark.parametrize("trace_style", ["", "scatter", "spline", "scatter_spline", "bar", "bubble", "scatter3d", "mesh3d",
+                                         "scatter__rainbow", "lines__viridis", "bar__Blues", "nonexistent"])
+def test_compiled_patches_give_the_same_styles(trace_style):
+    compiled_trace_style_patches = {}
+    styled_data_series_list = [JSONRecordCreator.apply_trace_style_to_single_data_series(make_data_series(trace_style), trace_styles_collection="default", compiled_trace_style_patches=compiled_trace_style_patches) for _ in range(2)]
+    uncompiled_data_series = JSONRecordCreator.apply_trace_style_to_single_data_series(make_data_series(trace_style), trace_styles_collection="default")
+    assert styled_data_series_list[0] == uncompiled_data_series
+    assert styled_data_series_list[1] == uncompiled_data_series
+    assert len(compiled_trace_style_patches) == 1
+
+
+def test_patches_are_looked_up_once_per_fig_dict(monkeypatch):
+    number_of_lookups = []
+    original_function = JSONRecordCreator.get_compiled_trace_style_patch
+    def counting_function(*args, **kwargs):
+        number_of_lookups.append(1)
+        return original_function(*args, **kwargs)
+    monkeypatch.setattr(JSONRecordCreator, "get_compiled_trace_style_patch", counting_function)
+    fig_dict = {"layout": {}, "data": [make_data_series("scatter") for _ in range(10)] + [make_data_series("spline") for _ in range(10)]}
+    JSONRecordCreator.apply_trace_styles_collection_to_plotly_dict(fig_dict, trace_styles_collection="default")
+    assert len(number_of_lookups) == 2
+    assert fig_dict["data"][0]["mode"] == "markers"
+
+
+def test_styled_data_series_do_not_share_style_dictionaries():
+    fig_dict = {"layout": {}, "data": [make_data_series("scatter"), make_data_series("scatter")]}
+    original_patch = copy.deepcopy(JSONRecordCreator.get_compiled_trace_style_patch("default", "scatter"))
+    JSONRecordCreator.apply_trace_styles_collection_to_plotly_dict(fig_dict, trace_styles_collection="default")
+    first_series, second_series = fig_dict["data"]
+    assert first_series["marker"] is not second_series["marker"]
+    first_series["marker"]["size"] = 50
+    assert second_series["marker"].get("size") != 50
+    assert JSONRecordCreator.get_compiled_trace_style_patch("default", "scatter") == original_patch
+
+
+def test_remove_trace_style_in_place():
+    data_series = JSONRecordCreator.JSONGrapherDataSeries()
+    data_series.update_while_preserving_old_terms({"name": "a", "x": [1], "y": [2], "mode": "lines", "line": {"width": 2}})
+    assert JSONRecordCreator.remove_trace_style_from_single_data_series(data_series, in_place=True) is data_series
+    assert ("mode" not in data_series) and ("line" not in data_series)
+    plain_data_series = {"name": "a", "x": [1], "y": [2], "mode": "lines"}
+    cleaned_data_series = JSONRecordCreator.remove_trace_style_from_single_data_series(plain_data_series, in_place=True)
+    assert cleaned_data_series is not plain_data_series
+    assert plain_data_series["mode"] == "lines"
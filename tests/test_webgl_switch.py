@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import JSONGrapher.JSONRecordCreator as JSONRecordCreator
+from conftest import make_simple_record
+
+
+def make_large_record(number_of_points=JSONRecordCreator.default_webgl_point_threshold + 1):
+    record = make_simple_record(x_values=list(range(number_of_points)), y_values=list(range(number_of_points)))
+    record.add_data_series("small_series", [1, 2, 3], [4, 5, 6])
+    return record
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_large_series_are_plotted_with_scattergl_by_default(use_cache):
+    record = make_large_record()
+    stored_fig_dict = json.dumps(record.fig_dict)
+    fig = record.get_plotly_fig(use_cache=use_cache)
+    assert [trace.type for trace in fig.data] == ["scattergl", "scatter"]
+    assert fig.data[0].line.shape != "spline" #scattergl does not draw splines.
+    assert json.dumps(record.fig_dict) == stored_fig_dict #only the plotted copy is switched.
+
+
+@pytest.mark.parametrize("webgl_point_threshold, expected_types", [("none", ["scatter", "scatter"]), (2, ["scattergl", "scattergl"]), (None, ["scattergl", "scatter"])])
+def test_webgl_point_threshold_in_the_plot_style(webgl_point_threshold, expected_types):
+    plot_style = {"layout_style": "default", "trace_styles_collection": "default", "webgl_point_threshold": webgl_point_threshold}
+    fig = make_large_record().get_plotly_fig(plot_style=plot_style)
+    assert [trace.type for trace in fig.data] == expected_types
+
+
+def test_default_threshold_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(JSONRecordCreator, "default_webgl_point_threshold", "none")
+    fig = make_large_record().get_plotly_fig()
+    assert fig.data[0].type == "scatter"
+
+
+def test_downsampled_series_are_not_switched():
+    fig = make_large_record().get_plotly_fig(max_points_per_series=500)
+    assert fig.data[0].type == "scatter"
+
+
+def test_switch_returns_a_copy():
+    fig_dict = {"layout": {}, "data": [{"type": "scatter", "x": [1, 2, 3], "y": [1, 2, 3], "line": {"shape": "spline"}}, {"type": "bar", "x": [1, 2, 3], "y": [1, 2, 3]}]}
+    switched_fig_dict = JSONRecordCreator.switch_large_scatter_series_to_webgl(fig_dict, webgl_point_threshold=2)
+    assert switched_fig_dict["data"][0]["type"] == "scattergl"
+    assert switched_fig_dict["data"][0]["line"]["shape"] == "linear"
+    assert switched_fig_dict["data"][1]["type"] == "bar"
+    assert (fig_dict["data"][0]["type"], fig_dict["data"][0]["line"]["shape"]) == ("scatter", "spline")